@@ -1,8 +1,43 @@
+import heapq
 from copy import deepcopy
+from functools import lru_cache
 from provider import ProviderObject
 from receiver import ReceiverObject
 
 
+class SearchCancelled(Exception):
+	"""Raised by Board.search when its should_stop callback asks it to stop."""
+
+
+@lru_cache(maxsize=None)
+def footprint_offsets(width, height):
+	"""Cell offsets covered by an object of the given (already rotated) size."""
+	return tuple((dx, dy) for dx in range(height) for dy in range(width))
+
+
+@lru_cache(maxsize=None)
+def effect_offsets(width, height, effect_radius):
+	"""Cell offsets reached by a provider of the given (already rotated) size."""
+	return tuple(
+		(dx, dy)
+		for dx in range(-effect_radius, width + effect_radius + 1)
+		for dy in range(-effect_radius, height + effect_radius + 1)
+	)
+
+
+def drop_placement(placements, obj, x, y, rotated):
+	"""
+	Delete a placement from a list, searching from the end since removals
+	mostly undo recent placements. Two placements of the same object at the
+	same position would overlap, so there is at most one match.
+	"""
+	for i in range(len(placements) - 1, -1, -1):
+		placed, px, py, protated = placements[i]
+		if placed is obj and px == x and py == y and protated == rotated:
+			del placements[i]
+			return
+
+
 class Board:
 	def __init__(self, grid_size, providers, receivers):
 		self.grid_size = grid_size
@@ -13,6 +48,8 @@ class Board:
 		self.receivers = receivers
 		self.placed_providers = []
 		self.placed_receivers = []
+		self.placement_order = []  # Every placement, in the order it was made
+		self.search_area = None  # Optional (min_x, max_x, min_y, max_y) placements must stay inside
 		self.best_board = None  # To track the best board state
 
 	def clone(self):
@@ -31,33 +68,36 @@ class Board:
 	def is_valid_position(self, obj, x, y, rotated):
 		"""Check if an object can be placed at (x, y) on the grid."""
 		width, height = (obj.width, obj.height) if not rotated else (obj.height, obj.width)
+		# Check if the object stays inside the search area, footprint as in place_object
+		if self.search_area is not None:
+			min_x, max_x, min_y, max_y = self.search_area
+			if x < min_x or x + height - 1 > max_x or y < min_y or y + width - 1 > max_y:
+				return False
 		# Check if placing the object expands the grid borders
 		if self.calculate_and_check_border_extension(x, y, width, height, False) is None:
 			return False
 
 		# Check for overlaps
-		for dx in range(height):
-			for dy in range(width):
-				if (x + dx, y + dy) in self.grid:  # Cell is already occupied
-					return False
+		for dx, dy in footprint_offsets(width, height):
+			if (x + dx, y + dy) in self.grid:  # Cell is already occupied
+				return False
 
 		return True
 
 	def place_object(self, obj, x, y, rotated):
 		"""Place an object on the grid."""
 		width, height = (obj.width, obj.height) if not rotated else (obj.height, obj.width)
-		for dx in range(height):
-			for dy in range(width):
-				self.grid[(x + dx, y + dy)] = obj
+		for dx, dy in footprint_offsets(width, height):
+			self.grid[(x + dx, y + dy)] = obj
+		self.placement_order.append((obj, x, y, rotated))
 
 		if isinstance(obj, ProviderObject):
 			self.placed_providers.append((obj, x, y, rotated))
 			# Update points_map for all cells within the provider's effect radius
-			for dx in range(-obj.effect_radius, width + obj.effect_radius + 1):
-				for dy in range(-obj.effect_radius, height + obj.effect_radius + 1):
-					px, py = x + dx, y + dy
-					if (px, py) not in self.grid:  # Only update unoccupied cells
-						self.points_map[(px, py)] = self.points_map.get((px, py), 0) + obj.points
+			for dx, dy in effect_offsets(width, height, obj.effect_radius):
+				px, py = x + dx, y + dy
+				if (px, py) not in self.grid:  # Only update unoccupied cells
+					self.points_map[(px, py)] = self.points_map.get((px, py), 0) + obj.points
 
 		elif isinstance(obj, ReceiverObject):
 			self.placed_receivers.append((obj, x, y, rotated))
@@ -67,23 +107,18 @@ class Board:
 		width, height = (obj.width, obj.height) if not rotated else (obj.height, obj.width)
 
 		if isinstance(obj, ProviderObject):
-			self.placed_providers = [
-				p for p in self.placed_providers if p[0] != obj or p[1] != x or p[2] != y or p[3] != rotated
-			]
+			drop_placement(self.placed_providers, obj, x, y, rotated)
 			# Update points_map for all cells within the provider's effect radius
-			for dx in range(-obj.effect_radius, width + obj.effect_radius + 1):
-				for dy in range(-obj.effect_radius, height + obj.effect_radius + 1):
-					px, py = x + dx, y + dy
-					if (px, py) not in self.grid:  # Only update unoccupied cells
-						self.points_map[(px, py)] = self.points_map.get((px, py), 0) - obj.points
+			for dx, dy in effect_offsets(width, height, obj.effect_radius):
+				px, py = x + dx, y + dy
+				if (px, py) not in self.grid:  # Only update unoccupied cells
+					self.points_map[(px, py)] = self.points_map.get((px, py), 0) - obj.points
 		elif isinstance(obj, ReceiverObject):
-			self.placed_receivers = [
-				r for r in self.placed_receivers if r[0] != obj or r[1] != x or r[2] != y or r[3] != rotated
-			]
+			drop_placement(self.placed_receivers, obj, x, y, rotated)
+		drop_placement(self.placement_order, obj, x, y, rotated)
 		# Remove the object from the grid after updating points_map
-		for dx in range(height):
-			for dy in range(width):
-				del self.grid[(x + dx, y + dy)]
+		for dx, dy in footprint_offsets(width, height):
+			del self.grid[(x + dx, y + dy)]
 
 	def calculate_and_check_border_extension(self, x, y, width = 1, height = 1, rotated=False):
 		"""
@@ -161,33 +196,48 @@ class Board:
 		if self.best_board is None or self.compare(self.best_board) > 0:
 			self.best_board = self.clone()
 
-	def print_grid(self):
-		"""Print the grid based on current grid borders."""
-		min_x, max_x, min_y, max_y = self.current_grid_borders
-		print("\nGrid:")
+	def layout_bounds(self):
+		"""
+		Return the (min_x, max_x, min_y, max_y) covering every occupied or scored cell.
+		points_map keeps cells whose points dropped back to 0, those are ignored.
+		"""
+		cells = list(self.grid) + [pos for pos, points in self.points_map.items() if points]
+		if not cells:
+			return self.current_grid_borders
+		xs = [x for x, _ in cells]
+		ys = [y for _, y in cells]
+		return (min(xs), max(xs), min(ys), max(ys))
+
+	def render_grid(self, bounds=None):
+		"""Render the grid as text, one line per row, defaulting to the layout bounds."""
+		min_x, max_x, min_y, max_y = bounds or self.layout_bounds()
+		grid = self.grid
+		rows = []
 		for y in range(min_y, max_y + 1):
-			for x in range(min_x, max_x + 1):
-				if (x, y) in self.grid:
-					# Print the first character of the object's name
-					print(self.grid[(x, y)].name[0], end=" ")
-				else:
-					print(".", end=" ")  # Empty cell
-			print()  # Newline after each row
+			# First character of the object's name, "." for an empty cell
+			rows.append(" ".join(grid[(x, y)].name[0] if (x, y) in grid else "." for x in range(min_x, max_x + 1)) + " ")
+		return "\n".join(rows)
+
+	def render_points_map(self, bounds=None):
+		"""Render the points map as text, one line per row, defaulting to the layout bounds."""
+		min_x, max_x, min_y, max_y = bounds or self.layout_bounds()
+		points_map = self.points_map
+		rows = []
+		for y in range(min_y, max_y + 1):
+			rows.append(" ".join(f"{points_map[(x, y)]:3}" if points_map.get((x, y)) else " . " for x in range(min_x, max_x + 1)) + " ")
+		return "\n".join(rows)
+
+	def print_grid(self):
+		"""Print the grid over the layout bounds."""
+		print("\nGrid:\n" + self.render_grid())
 
 	def print_points_map(self):
 		"""Print the points map."""
-		min_x, max_x, min_y, max_y = self.current_grid_borders
-		print("\nPoints Map:")
-		for y in range(min_y, max_y + 1):
-			for x in range(min_x, max_x + 1):
-				if (x, y) in self.points_map:
-					print(f"{self.points_map[(x, y)]:3}", end=" ")
-				else:
-					print(" . ", end=" ")
+		print("\nPoints Map:\n" + self.render_points_map())
 
 	def print_board_details(self):
 		"""Print the board with details."""
-		min_x, max_x, min_y, max_y = self.current_grid_borders
+		min_x, max_x, min_y, max_y = self.layout_bounds()
 		grid_width, grid_height = self.grid_size
 
 		print("\n=== Board Details ===")
@@ -203,7 +253,11 @@ class Board:
 		self.print_grid()
 	
 	def backtrack(self):
-		"""Backtracking algorithm to place receivers and providers."""
+		"""
+		Recursive backtracking algorithm to place receivers and providers, logging
+		every attempt. The solvers use search instead; this stays as the reference
+		search is checked against and as a verbose trace for debugging small cases.
+		"""
 		# Base case: Check if all receivers are placed
 		if not self.receivers:
 			self.update_best_board()
@@ -258,6 +312,103 @@ class Board:
 		possible_positions.sort(key=lambda pos: self.calculate_position_interest(receiver, pos), reverse=True)
 		return possible_positions
 
+	def iter_positions_for_receiver(self, receiver):
+		"""
+		Lazily yield the valid positions for the receiver, most interesting first.
+
+		Only valid positions are scored and pushed on the heap, as flat
+		(-interest, order, x, y, rotated) entries, and a square receiver is only
+		tried unrotated since both orientations cover the same cells. A search
+		branch that stops early never pays for the full ordering.
+		"""
+		area = self.search_area
+		if area is not None and (area[1] - area[0] + 1) * (area[3] - area[2] + 1) < len(self.points_map):
+			# Scan the small search area rather than the whole points map
+			cells = [
+				(x, y) for x in range(area[0], area[1] + 1) for y in range(area[2], area[3] + 1)
+				if (x, y) in self.points_map
+			]
+		elif self.points_map:
+			cells = self.points_map.keys()
+		elif area is not None:
+			# Start from the middle of the search area if points map is empty
+			cells = [((area[0] + area[1]) // 2, (area[2] + area[3]) // 2)]
+		else:
+			# Default to (0, 0) if points map is empty
+			cells = [(0, 0)]
+		rotations = [False] if receiver.width == receiver.height else [False, True]
+
+		# The order number keeps ties in the same order as a stable sort
+		heap = []
+		for (x, y) in cells:
+			for rotated in rotations:
+				if self.is_valid_position(receiver, x, y, rotated):
+					heap.append((-self.calculate_position_interest(receiver, (x, y, rotated)), len(heap), x, y, rotated))
+		heapq.heapify(heap)
+
+		# The board is back in the same state whenever the next candidate is
+		# asked for, so positions checked above are still valid
+		while heap:
+			_, _, x, y, rotated = heapq.heappop(heap)
+			yield x, y, rotated
+
+	def search(self, should_stop=None, keep_best=True):
+		"""
+		Iterative equivalent of backtrack using an explicit stack of frames.
+
+		Each frame is [receiver, candidate iterator, current position, provider mark],
+		where the provider mark is the length of placed_providers before the
+		receiver's providers were placed, so a failed branch removes them too.
+
+		Args:
+			should_stop (callable): Checked before every attempt; when it returns True the
+				search raises SearchCancelled, leaving the board mid-search.
+			keep_best (bool): Whether to clone the solved board into best_board. The
+				board itself is left on the solved layout either way.
+		"""
+		pending = self.receivers
+		stack = []
+		descend = True
+
+		while True:
+			if should_stop is not None and should_stop():
+				raise SearchCancelled()
+			if descend:
+				if len(stack) == len(pending):
+					self.receivers = []
+					if keep_best:
+						self.update_best_board()
+					return True
+				receiver = pending[len(stack)]
+				stack.append([receiver, self.iter_positions_for_receiver(receiver), None, None])
+
+			frame = stack[-1]
+			receiver, candidates, position, mark = frame
+			if position is not None:
+				# Undo the previous attempt: its providers first, then the receiver
+				for provider, px, py, protated in reversed(self.placed_providers[mark:]):
+					self.remove_object(provider, px, py, protated)
+				self.remove_object(receiver, *position)
+				frame[2] = None
+
+			descend = False
+			for x, y, rotated in candidates:
+				if should_stop is not None and should_stop():
+					raise SearchCancelled()
+				mark = len(self.placed_providers)
+				self.place_object(receiver, x, y, rotated)
+				if self.place_providers_for_receiver(receiver, (x, y, rotated)):
+					frame[2] = (x, y, rotated)
+					frame[3] = mark
+					descend = True
+					break
+				self.remove_object(receiver, x, y, rotated)
+
+			if not descend:
+				stack.pop()
+				if not stack:
+					return False
+
 	def calculate_position_interest(self, receiver, position):
 		"""Calculate how interesting a position is for placing a receiver."""
 		x, y, rotated = position
@@ -291,9 +442,212 @@ class Board:
 
 		# Check if the receiver's requirements are satisfied
 		if required_points > 0:
-			# Remove placed providers if requirements are not met
-			for provider, px, py, protated in placed_providers:
+			# Remove placed providers if requirements are not met, last placed first
+			for provider, px, py, protated in reversed(placed_providers):
 				self.remove_object(provider, px, py, protated)
 			return False
 
-		return True
\ No newline at end of file
+		return True
+
+	def placement_bounds(self, obj, x, y, rotated):
+		"""Return the (min_x, max_x, min_y, max_y) cells covered by a placed object."""
+		width, height = (obj.width, obj.height) if not rotated else (obj.height, obj.width)
+		return (x, x + height - 1, y, y + width - 1)
+
+	def lift_placements(self, placements):
+		"""
+		Lift the given placements off the grid.
+
+		points_map only counts a provider on cells that were free when it was
+		placed, so placements are undone in reverse placement order: everything
+		placed after the earliest lifted placement is removed, then the ones
+		that are kept are placed again in their original order.
+		"""
+		lifted = set(placements)
+		if not lifted:
+			return
+		start = min(i for i, placement in enumerate(self.placement_order) if placement in lifted)
+		tail = self.placement_order[start:]
+		for obj, x, y, rotated in reversed(tail):
+			self.remove_object(obj, x, y, rotated)
+		for placement in tail:
+			if placement not in lifted:
+				self.place_object(*placement)
+
+	def expand_to_groups(self, placements):
+		"""
+		Extend placements to whole groups, a group being a receiver and the
+		providers placed right after it for its required points.
+
+		Returns:
+			list: The placements of every group touched, in placement order.
+		"""
+		selected = set(placements)
+		expanded = []
+		group = []
+		for placement in self.placement_order + [None]:
+			if placement is None or isinstance(placement[0], ReceiverObject):
+				if any(p in selected for p in group):
+					expanded.extend(group)
+				group = []
+			if placement is not None:
+				group.append(placement)
+		return expanded
+
+	def discard_object(self, obj):
+		"""
+		Remove an object from the inventory and lift every placement of it off the grid.
+		The object must belong to this board: one of self.providers, self.receivers
+		or a placement in placed_providers/placed_receivers. Boards returned by the
+		solver are copies, so the caller's original buildings are not on them.
+
+		Receivers served by a discarded provider are lifted and queued again.
+
+		Returns:
+			list: The bounds of the placements that were lifted.
+
+		Raises:
+			ValueError: If the object is not on this board.
+		"""
+		if isinstance(obj, ProviderObject):
+			inventory = self.providers
+			placements = [p for p in self.placed_providers if p[0] is obj]
+		else:
+			inventory = self.receivers
+			placements = [r for r in self.placed_receivers if r[0] is obj]
+
+		in_inventory = any(o is obj for o in inventory)
+		if not in_inventory and not placements:
+			raise ValueError(f"'{obj.name}' is not on this board, pass the object from its placed or inventory lists")
+		if in_inventory:
+			inventory.remove(obj)
+
+		# Receivers served by a discarded provider lose its points, queue them again
+		lifted = self.expand_to_groups(placements)
+		self.lift_placements(lifted)
+		for placed, x, y, rotated in lifted:
+			if isinstance(placed, ReceiverObject) and placed is not obj:
+				self.receivers.append(placed)
+		return [self.placement_bounds(*placement) for placement in lifted]
+
+	def unfix_regions(self, regions, margin):
+		"""
+		Lift every placed object overlapping one of the regions grown by margin,
+		together with the rest of its group (see expand_to_groups).
+		Lifted receivers are queued again in self.receivers.
+
+		Returns:
+			int: The number of objects lifted.
+		"""
+		grown = [(min_x - margin, max_x + margin, min_y - margin, max_y + margin) for min_x, max_x, min_y, max_y in regions]
+
+		def overlaps(bounds):
+			b_min_x, b_max_x, b_min_y, b_max_y = bounds
+			return any(
+				b_min_x <= max_x and min_x <= b_max_x and b_min_y <= max_y and min_y <= b_max_y
+				for min_x, max_x, min_y, max_y in grown
+			)
+
+		placements = self.expand_to_groups([p for p in self.placement_order if overlaps(self.placement_bounds(*p))])
+		self.lift_placements(placements)
+		for obj, x, y, rotated in placements:
+			if isinstance(obj, ReceiverObject):
+				self.receivers.append(obj)
+		return len(placements)
+
+	def holds(self, obj):
+		"""Check if an object is in this board's inventory or placed on it."""
+		return any(o is obj for o in self.providers + self.receivers) or any(p[0] is obj for p in self.placement_order)
+
+	def snapshot(self):
+		"""Capture the layout and inventory, so restore can undo a failed repair."""
+		return (list(self.placement_order), list(self.providers), list(self.receivers))
+
+	def restore(self, snapshot):
+		"""Put back a layout and inventory captured by snapshot."""
+		placement_order, providers, receivers = snapshot
+		self.lift_placements(self.placement_order)
+		for placement in placement_order:
+			self.place_object(*placement)
+		self.providers = providers
+		self.receivers = receivers
+
+	def resolve_regions(self, regions, radius=1):
+		"""
+		Re-search only the neighborhood of the given regions, keeping the rest of
+		the layout fixed. The neighborhood doubles every time the search fails,
+		until it covers the whole layout.
+
+		Returns:
+			Board: The repaired board, or None if no layout was found.
+		"""
+		# Extent of the layout: once a grown region covers it, growing further is useless
+		bounds = [self.placement_bounds(*placement) for placement in self.placement_order]
+		if bounds:
+			extent = (min(b[0] for b in bounds), max(b[1] for b in bounds), min(b[2] for b in bounds), max(b[3] for b in bounds))
+
+		margin = radius
+		while True:
+			self.unfix_regions(regions, margin)
+			self.best_board = None
+			if self.search():
+				return self.best_board
+			if not regions or not self.placement_order:
+				return None
+			if bounds and any(
+				min_x - margin <= extent[0] and extent[1] <= max_x + margin and min_y - margin <= extent[2] and extent[3] <= max_y + margin
+				for min_x, max_x, min_y, max_y in regions
+			):
+				return None
+			margin = max(1, margin * 2)
+
+	def repair_layout(self, added=(), removed=(), radius=1):
+		"""
+		Update a solved layout after buildings were added to or removed from the
+		inventory, re-searching only around the change. When no layout is found
+		the board is left as it was.
+
+		Args:
+			added (list): Providers and receivers to add to the inventory.
+			removed (list): Providers and receivers to take out of the inventory.
+			radius (int): Initial margin, in cells, of the neighborhood to unfix.
+
+		Returns:
+			Board: The repaired board, or None if no layout was found.
+
+		Raises:
+			ValueError: If a removed object is not on this board, before anything changes.
+		"""
+		for obj in removed:
+			if not self.holds(obj):
+				raise ValueError(f"'{obj.name}' is not on this board, pass the object from its placed or inventory lists")
+
+		snapshot = self.snapshot()
+		regions = []
+		for obj in removed:
+			regions.extend(self.discard_object(obj))
+
+		for obj in added:
+			if isinstance(obj, ProviderObject):
+				self.providers.append(obj)
+			else:
+				self.receivers.append(obj)
+				# Seed the neighborhood where a new receiver would want to go
+				if self.points_map:
+					x, y = max(self.points_map, key=self.points_map.get)
+				else:
+					x, y = 0, 0
+				regions.append(self.placement_bounds(obj, x, y, False))
+
+		# Rebind the inventory so provider searches look at this board
+		for obj in self.providers + self.receivers:
+			obj.board = self
+
+		# A receiver asks every provider at most once, so it can never get more than their total
+		available = sum(provider.points for provider in self.providers)
+		if all(receiver.required_points <= available for receiver in self.receivers):
+			repaired = self.resolve_regions(regions, radius)
+			if repaired is not None:
+				return repaired
+		self.restore(snapshot)
+		return None
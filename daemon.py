@@ -0,0 +1,350 @@
+"""
+Long-running solve daemon.
+
+Instances are sent as one JSON object per line over a TCP or Unix socket:
+
+	{"id": "job-1", "grid_size": [6, 6], "deadline": 5.0,
+	 "providers": [{"name": "B", "width": 1, "height": 2, "points": 100, "effect_radius": 1}],
+	 "receivers": [{"name": "A", "width": 2, "height": 2, "required_points": 400}]}
+
+	{"cancel": "job-1"}
+
+Every job is answered with a "queued" (or "rejected") line, then one result
+line whose status is "solved", "unsolved", "cancelled", "timeout" or "error".
+Solved results carry placed_providers/placed_receivers as [name, x, y, rotated].
+Jobs sent without an "id" get one from the daemon, returned in the "queued" line.
+Ids and cancellation are scoped to the connection that submitted the job.
+
+Searches run in a pool of worker processes, so --workers solves run in
+parallel. Each process keeps its own warm stencil tables and LRU cache of
+solved instances. Cancellation reaches a running search through a flag in
+shared memory that the search polls.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from board import Board, SearchCancelled
+from provider import ProviderObject
+from receiver import ReceiverObject
+
+
+class Job:
+	def __init__(self, job_id, payload, reply, owner, slot, deadline=None):
+		self.job_id = job_id
+		self.payload = payload
+		self.reply = reply
+		self.owner = owner
+		self.slot = slot  # Index of the job's cancel flag in shared memory
+		# Wall clock rather than monotonic, so worker processes can compare against it
+		self.deadline = time.time() + deadline if deadline is not None else None
+		self.cancelled = threading.Event()
+		self.acknowledged = threading.Event()  # Set once "queued" went out
+		self.done = threading.Event()
+
+	def expired(self):
+		return self.deadline is not None and time.time() > self.deadline
+
+
+def instance_key(payload):
+	"""Cache key for an instance, independent of job id and deadline."""
+	return json.dumps(
+		[payload["grid_size"], payload.get("providers", []), payload.get("receivers", [])],
+		sort_keys=True,
+	)
+
+
+def build_board(payload):
+	"""Create the board, providers and receivers described by a payload."""
+	providers = [
+		ProviderObject(p["name"], p["width"], p["height"], p["points"], p["effect_radius"], None)
+		for p in payload.get("providers", [])
+	]
+	receivers = [
+		ReceiverObject(r["name"], r["width"], r["height"], r["required_points"], None)
+		for r in payload.get("receivers", [])
+	]
+	board = Board(tuple(payload["grid_size"]), providers, receivers)
+	for obj in providers + receivers:
+		obj.board = board
+	return board
+
+
+def placements(board):
+	"""Serialize the placements of a solved board."""
+	return {
+		"placed_providers": [[obj.name, x, y, rotated] for obj, x, y, rotated in board.placed_providers],
+		"placed_receivers": [[obj.name, x, y, rotated] for obj, x, y, rotated in board.placed_receivers],
+	}
+
+
+# State of a worker process, set up by init_worker
+worker_flags = None
+worker_cache = None
+worker_cache_size = 0
+
+
+def init_worker(flags, cache_size):
+	"""Initializer of the worker processes."""
+	global worker_flags, worker_cache, worker_cache_size
+	worker_flags = flags
+	worker_cache = OrderedDict()
+	worker_cache_size = cache_size
+
+
+def run_job(payload, slot, deadline):
+	"""
+	Solve one payload inside a worker process.
+
+	Args:
+		payload (dict): The instance.
+		slot (int): Index of the job's cancel flag in worker_flags.
+		deadline (float): time.time() after which the search stops, or None.
+
+	Returns:
+		dict: The result message, without the job id.
+	"""
+	def should_stop():
+		return worker_flags[slot] or (deadline is not None and time.time() > deadline)
+
+	key = instance_key(payload)
+	if key in worker_cache:
+		worker_cache.move_to_end(key)
+		return dict(worker_cache[key], cached=True)
+
+	board = build_board(payload)
+	try:
+		solved = board.search(should_stop=should_stop)
+	except SearchCancelled:
+		return {"status": "cancelled" if worker_flags[slot] else "timeout"}
+
+	if solved:
+		result = dict(placements(board.best_board), status="solved")
+	else:
+		result = {"status": "unsolved"}
+	worker_cache[key] = result
+	while len(worker_cache) > worker_cache_size:
+		worker_cache.popitem(last=False)
+	return dict(result)
+
+
+class SolveDaemon:
+	"""
+	Bounded job queue feeding a pool of worker processes. One dispatcher
+	thread per worker hands jobs over and streams the results back.
+	"""
+
+	def __init__(self, workers=4, queue_size=64, cache_size=256):
+		self.jobs = queue.Queue(maxsize=queue_size)
+		self.active = {}  # Queued or running jobs by (owner, id), for cancellation
+		self.job_ids = itertools.count(1)
+		self.lock = threading.Lock()
+		# One cancel flag per job that can be queued or running at once
+		self.flags = multiprocessing.RawArray("b", queue_size + workers)
+		self.free_slots = list(range(queue_size + workers))
+		self.workers = workers
+		self.cache_size = cache_size
+		self.pool = self.start_pool() if workers else None
+		self.dispatchers = [threading.Thread(target=self.work, daemon=True) for _ in range(workers)]
+		for dispatcher in self.dispatchers:
+			dispatcher.start()
+
+	def start_pool(self):
+		return ProcessPoolExecutor(
+			max_workers=self.workers, initializer=init_worker, initargs=(self.flags, self.cache_size)
+		)
+
+	def close(self):
+		"""Stop the worker processes."""
+		if self.pool is not None:
+			self.pool.shutdown(wait=True, cancel_futures=True)
+
+	def submit(self, payload, reply, owner=None):
+		"""
+		Queue a job for the given owner (the submitting connection). Invalid
+		payloads and ids already used by the owner are answered with "error"
+		and a full queue with "rejected", right away.
+
+		Returns:
+			Job: The queued job, or None if it was not queued.
+		"""
+		if not isinstance(payload, dict):
+			reply({"status": "error", "error": "payload must be a JSON object"})
+			return None
+		job_id = payload.get("id")
+		deadline = payload.get("deadline")
+		if job_id is not None and (isinstance(job_id, bool) or not isinstance(job_id, (str, int))):
+			reply({"status": "error", "error": "id must be a string or an integer"})
+			return None
+		if deadline is not None and (isinstance(deadline, bool) or not isinstance(deadline, (int, float))):
+			reply({"id": job_id, "status": "error", "error": "deadline must be a number of seconds"})
+			return None
+
+		with self.lock:
+			if job_id is None:
+				job_id = f"job-{next(self.job_ids)}"
+				while (owner, job_id) in self.active:
+					job_id = f"job-{next(self.job_ids)}"
+			elif (owner, job_id) in self.active:
+				reply({"id": job_id, "status": "error", "error": "a job with this id is already queued or running"})
+				return None
+			if not self.free_slots:
+				reply({"id": job_id, "status": "rejected", "error": "queue full"})
+				return None
+			slot = self.free_slots.pop()
+			self.flags[slot] = 0
+			job = Job(job_id, payload, reply, owner, slot, deadline)
+			self.active[(owner, job_id)] = job
+
+		try:
+			self.jobs.put_nowait(job)
+		except queue.Full:
+			self.finish(job, {"status": "rejected", "error": "queue full"})
+			return None
+		try:
+			reply({"id": job.job_id, "status": "queued"})
+		finally:
+			job.acknowledged.set()
+		return job
+
+	def cancel(self, job_id, owner=None):
+		"""Cancel a queued or running job of the owner. Returns False if the owner has no such job."""
+		with self.lock:
+			try:
+				job = self.active.get((owner, job_id))
+			except TypeError:  # Unhashable id, it cannot match a job
+				job = None
+			if job is None:
+				return False
+			job.cancelled.set()
+			self.flags[job.slot] = 1
+		return True
+
+	def finish(self, job, result):
+		with self.lock:
+			if self.active.get((job.owner, job.job_id)) is job:
+				del self.active[(job.owner, job.job_id)]
+				self.free_slots.append(job.slot)
+		result["id"] = job.job_id
+		job.reply(result)
+		job.done.set()
+
+	def solve(self, job):
+		"""Run one job in a worker process and build its result message."""
+		if job.cancelled.is_set():
+			return {"status": "cancelled"}
+		if job.expired():
+			return {"status": "timeout"}
+		try:
+			return self.pool.submit(run_job, job.payload, job.slot, job.deadline).result()
+		except BrokenProcessPool:
+			# A worker process died, replace the pool for the next jobs
+			with self.lock:
+				self.pool = self.start_pool()
+			return {"status": "error", "error": "worker process died"}
+
+	def work(self):
+		while True:
+			job = self.jobs.get()
+			try:
+				result = self.solve(job)
+			except Exception as error:  # Report bad payloads instead of killing the dispatcher
+				result = {"status": "error", "error": str(error)}
+			# Never let a result overtake the job's "queued" line
+			job.acknowledged.wait()
+			try:
+				self.finish(job, result)
+			except Exception:
+				pass  # The client cannot be answered anymore, keep the dispatcher alive
+			finally:
+				job.done.set()
+				self.jobs.task_done()
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+	"""Reads JSON lines from a client and streams results back as they finish."""
+
+	def handle(self):
+		write_lock = threading.Lock()
+
+		def reply(message):
+			data = (json.dumps(message) + "\n").encode()
+			with write_lock:
+				try:
+					self.wfile.write(data)
+					self.wfile.flush()
+				except (OSError, ValueError):
+					pass  # Client went away, or the handler already closed the stream
+
+		pending = []
+		for line in self.rfile:
+			line = line.strip()
+			if not line:
+				continue
+			try:
+				payload = json.loads(line)
+			except ValueError as error:
+				reply({"status": "error", "error": str(error)})
+				continue
+			if isinstance(payload, dict) and "cancel" in payload:
+				found = self.server.daemon.cancel(payload["cancel"], owner=self)
+				reply({"id": payload["cancel"], "status": "cancelling" if found else "unknown"})
+				continue
+			job = self.server.daemon.submit(payload, reply, owner=self)
+			if job is not None:
+				pending.append(job)
+
+		# Client is done sending, keep the connection open until its results are out
+		for job in pending:
+			job.done.wait()
+
+
+class TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+	daemon_threads = True
+	allow_reuse_address = True
+
+
+class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+	daemon_threads = True
+
+
+def serve(daemon, host="127.0.0.1", port=8765, socket_path=None):
+	"""Serve the daemon on a Unix socket if socket_path is given, on host:port otherwise."""
+	if socket_path:
+		if os.path.exists(socket_path):
+			os.remove(socket_path)
+		server = UnixServer(socket_path, RequestHandler)
+	else:
+		server = TCPServer((host, port), RequestHandler)
+	server.daemon = daemon
+	with server:
+		server.serve_forever()
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Run the solver as a long-running daemon.")
+	parser.add_argument("--host", default="127.0.0.1")
+	parser.add_argument("--port", type=int, default=8765)
+	parser.add_argument("--socket", help="Listen on this Unix socket instead of a TCP port")
+	parser.add_argument("--workers", type=int, default=4, help="Worker processes running searches in parallel")
+	parser.add_argument("--queue-size", type=int, default=64)
+	parser.add_argument("--cache-size", type=int, default=256)
+	args = parser.parse_args()
+
+	daemon = SolveDaemon(args.workers, args.queue_size, args.cache_size)
+	try:
+		serve(daemon, args.host, args.port, args.socket)
+	finally:
+		daemon.close()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,256 @@
+from concurrent.futures import ProcessPoolExecutor
+from board import Board
+
+# Upper bound on the receivers handed to a single band search
+RECEIVERS_PER_BAND = 8
+# Bands lower than this would be mostly border strip when stitching
+MIN_BAND_HEIGHT = 8
+
+
+def split_into_bands(grid_size, band_count):
+	"""Split the grid into horizontal bands, returned as (y_offset, band_height)."""
+	grid_width, grid_height = grid_size
+	band_count = max(1, min(band_count, grid_height))
+	base_height, extra = divmod(grid_height, band_count)
+	bands = []
+	y_offset = 0
+	for i in range(band_count):
+		band_height = base_height + (1 if i < extra else 0)
+		bands.append((y_offset, band_height))
+		y_offset += band_height
+	return bands
+
+
+def fits_band(obj, grid_width, band_height):
+	"""Check if an object fits inside a band in at least one orientation."""
+	return (obj.width <= grid_width and obj.height <= band_height) or (obj.height <= grid_width and obj.width <= band_height)
+
+
+def assign_to_bands(grid_size, bands, providers, receivers):
+	"""
+	Fast pre-pass spreading buildings over the bands.
+
+	Receivers go, largest first, to the band with the largest share of its
+	cells still free. Providers then go to the band with the largest unmet
+	required points, as long as they still fit in its free cells.
+
+	Returns:
+		tuple: (per-band providers, per-band receivers, unassigned buildings)
+	"""
+	grid_width = grid_size[0]
+	capacity = [grid_width * band_height for _, band_height in bands]
+	total = list(capacity)
+	deficit = [0] * len(bands)
+	band_providers = [[] for _ in bands]
+	band_receivers = [[] for _ in bands]
+	unassigned = []
+
+	for receiver in sorted(receivers, key=lambda r: r.width * r.height, reverse=True):
+		area = receiver.width * receiver.height
+		candidates = [i for i, (_, band_height) in enumerate(bands) if fits_band(receiver, grid_width, band_height) and capacity[i] >= area]
+		if not candidates:
+			unassigned.append(receiver)
+			continue
+		i = max(candidates, key=lambda c: capacity[c] / total[c])
+		band_receivers[i].append(receiver)
+		capacity[i] -= area
+		deficit[i] += receiver.required_points
+
+	for provider in sorted(providers, key=lambda p: p.points, reverse=True):
+		area = provider.width * provider.height
+		candidates = [i for i, (_, band_height) in enumerate(bands) if fits_band(provider, grid_width, band_height) and capacity[i] >= area]
+		if not candidates:
+			unassigned.append(provider)
+			continue
+		i = max(candidates, key=lambda c: (deficit[c], capacity[c]))
+		band_providers[i].append(provider)
+		capacity[i] -= area
+		deficit[i] -= provider.points
+
+	return band_providers, band_receivers, unassigned
+
+
+def solve_band(band_size, providers, receivers):
+	"""
+	Solve a single band on its own board. Runs inside a worker process, so the
+	layout is returned as placements (index, x, y, rotated) into the band's
+	provider and receiver lists.
+
+	The search is kept inside the band and starts from its middle, so the
+	layout does not lean on the band borders. Placements are grouped per
+	receiver, with the providers placed for it.
+
+	Returns:
+		list: (receiver placement, provider placements) groups, or None if the band has no layout.
+	"""
+	band_width, band_height = band_size
+	board = Board(band_size, providers, list(receivers))
+	board.search_area = (0, band_width - 1, 0, band_height - 1)
+	for obj in providers + receivers:
+		obj.board = board
+	if not board.search(keep_best=False):
+		return None
+
+	# A successful search stops on the solved layout, read it from the live board
+	provider_index = {id(obj): i for i, obj in enumerate(providers)}
+	receiver_index = {id(obj): i for i, obj in enumerate(receivers)}
+
+	# search places every receiver right before its providers
+	groups = []
+	for obj, x, y, rotated in board.placement_order:
+		if id(obj) in receiver_index:
+			groups.append(((receiver_index[id(obj)], x, y, rotated), []))
+		else:
+			groups[-1][1].append((provider_index[id(obj)], x, y, rotated))
+	return groups
+
+
+def merge_bands(grid_size, providers, receivers, band_layouts):
+	"""
+	Copy every band layout onto one board, shifted to its band offset.
+	Placing through place_object rebuilds points_map, so provider effects
+	crossing band borders are counted on the merged board.
+
+	A receiver is only carried over together with all of its providers; when
+	one of them does not fit on the merged board, the receiver becomes a leftover.
+
+	Args:
+		band_layouts (list): (y_offset, band providers, band receivers, solve_band result) per band.
+
+	Returns:
+		tuple: (merged board, leftover receivers per band)
+	"""
+	grid_width, grid_height = grid_size
+	board = Board(grid_size, providers, [])
+	board.search_area = (0, grid_width - 1, 0, grid_height - 1)
+	for obj in providers + receivers:
+		obj.board = board
+	leftovers = []
+
+	for y_offset, band_providers, band_receivers, groups in band_layouts:
+		if groups is None:
+			leftovers.append(list(band_receivers))
+			continue
+		placed = set()
+		for (i, x, y, rotated), provider_placements in groups:
+			receiver = band_receivers[i]
+			group = [(receiver, x, y + y_offset, rotated)]
+			group.extend((band_providers[j], px, py + y_offset, protated) for j, px, py, protated in provider_placements)
+
+			merged = []
+			for placement in group:
+				if not board.is_valid_position(*placement):
+					break
+				board.place_object(*placement)
+				merged.append(placement)
+			else:
+				placed.add(i)
+				continue
+			board.lift_placements(merged)
+		leftovers.append([r for i, r in enumerate(band_receivers) if i not in placed])
+
+	return board, leftovers
+
+
+def stitch(board, regions, area, providers, receivers, radius):
+	"""
+	Unfix the regions and search them again together with the given receivers,
+	keeping candidates inside area and using only the given providers.
+	On failure the board is put back as it was.
+
+	Returns:
+		bool: Whether every receiver was placed.
+	"""
+	snapshot = board.snapshot()
+	board.search_area = area
+	board.providers = providers
+	board.receivers = list(receivers)
+	board.unfix_regions(regions, radius)
+	stitched = board.search(keep_best=False)
+	if not stitched:
+		board.restore(snapshot)
+	board.providers, board.receivers = snapshot[1], []
+	return stitched
+
+
+def solve_with_decomposition(grid_size, providers, receivers, band_count=None, workers=None, radius=1):
+	"""
+	Solve a large instance by splitting the grid into horizontal bands.
+
+	Buildings are spread over the bands by assign_to_bands, every band is
+	solved independently (in parallel when workers allows it), and a
+	stitching pass re-searches each band border within its two neighbouring
+	bands. Receivers a band could not place are then tried in their band and
+	its neighbours, and only what is still left goes through a search over
+	the whole grid.
+
+	Args:
+		grid_size (tuple): The (width, height) of the whole grid.
+		providers (list): The providers to place.
+		receivers (list): The receivers to place.
+		band_count (int): Number of bands, derived from the receiver count and
+			MIN_BAND_HEIGHT by default.
+		workers (int): Worker processes for the band searches, 1 to stay in process.
+		radius (int): Margin, in cells, unfixed around each band border when stitching.
+
+	Returns:
+		Board: The stitched board, or None if no layout was found.
+	"""
+	grid_width, grid_height = grid_size
+	if band_count is None:
+		band_count = min(-(-len(receivers) // RECEIVERS_PER_BAND), grid_height // MIN_BAND_HEIGHT)
+	bands = split_into_bands(grid_size, band_count)
+	band_providers, band_receivers, unassigned = assign_to_bands(grid_size, bands, providers, receivers)
+
+	jobs = [((grid_width, band_height), band_providers[i], band_receivers[i]) for i, (_, band_height) in enumerate(bands)]
+	if workers == 1 or len(bands) == 1:
+		results = [solve_band(*job) for job in jobs]
+	else:
+		with ProcessPoolExecutor(max_workers=workers) as executor:
+			results = list(executor.map(solve_band, *zip(*jobs)))
+
+	band_layouts = [
+		(y_offset, band_providers[i], band_receivers[i], results[i])
+		for i, (y_offset, _) in enumerate(bands)
+	]
+	board, leftovers = merge_bands(grid_size, providers, receivers, band_layouts)
+
+	# Providers no band could take come first, so the stitching searches use them
+	spare_providers = [obj for obj in unassigned if obj in providers]
+	board.providers = spare_providers + [obj for obj in providers if obj not in unassigned]
+
+	def neighbourhood(first, last):
+		"""Search area and providers of the bands first..last, clipped to the grid."""
+		first, last = max(0, first), min(len(bands) - 1, last)
+		area = (0, grid_width - 1, bands[first][0], bands[last][0] + bands[last][1] - 1)
+		return area, spare_providers + [p for i in range(first, last + 1) for p in band_providers[i]]
+
+	# Stitch every band border with the providers of the two bands it separates,
+	# searching only the strip around the border that the lift can reach into
+	reach = radius + max((max(obj.width, obj.height) for obj in providers + receivers), default=1)
+	for i in range(1, len(bands)):
+		y_offset = bands[i][0]
+		(min_x, max_x, min_y, max_y), local_providers = neighbourhood(i - 1, i)
+		area = (min_x, max_x, max(min_y, y_offset - 1 - reach), min(max_y, y_offset + reach))
+		stitch(board, [(0, grid_width - 1, y_offset - 1, y_offset)], area, local_providers, [], radius)
+
+	# Leftovers are tried in their own band and its neighbours first
+	remaining = []
+	regions = []
+	for i, band_leftovers in enumerate(leftovers):
+		if band_leftovers:
+			area, local_providers = neighbourhood(i - 1, i + 1)
+			if not stitch(board, [], area, local_providers, band_leftovers, radius):
+				remaining.extend(band_leftovers)
+				regions.append(area)
+	unassigned_receivers = [obj for obj in unassigned if obj in receivers]
+	remaining.extend(unassigned_receivers)
+
+	board.search_area = (0, grid_width - 1, 0, grid_height - 1)
+	if not remaining:
+		return board
+	# Whatever is still unplaced is searched over the whole grid, unfixing around its bands
+	if unassigned_receivers:
+		regions.append(board.search_area)
+	board.receivers = remaining
+	return board.resolve_regions(regions, radius)
@@ -0,0 +1,89 @@
+"""
+Export solved boards for other tools: placement lists as JSON, occupancy and
+points grids as a NumPy .npz file. numpy is optional and only needed by save_npz.
+"""
+import json
+from provider import ProviderObject
+
+# Occupancy codes used in the exported arrays
+EMPTY = 0
+PROVIDER = 1
+RECEIVER = 2
+
+
+def solution_to_dict(board):
+	"""Describe a solved board as plain data: bounds and placement lists."""
+	min_x, max_x, min_y, max_y = board.layout_bounds()
+	return {
+		"grid_size": list(board.grid_size),
+		"bounds": [min_x, max_x, min_y, max_y],
+		"placed_providers": [
+			{"name": obj.name, "x": x, "y": y, "rotated": rotated} for obj, x, y, rotated in board.placed_providers
+		],
+		"placed_receivers": [
+			{"name": obj.name, "x": x, "y": y, "rotated": rotated} for obj, x, y, rotated in board.placed_receivers
+		],
+	}
+
+
+def board_to_arrays(board, bounds=None):
+	"""
+	Lay the board out as row-major lists, rows along y and columns along x.
+
+	Returns:
+		tuple: (occupancy rows using the EMPTY/PROVIDER/RECEIVER codes, points rows)
+	"""
+	min_x, max_x, min_y, max_y = bounds or board.layout_bounds()
+	grid = board.grid
+	points_map = board.points_map
+	occupancy = []
+	points = []
+	for y in range(min_y, max_y + 1):
+		occupancy.append([
+			EMPTY if (x, y) not in grid else PROVIDER if isinstance(grid[(x, y)], ProviderObject) else RECEIVER
+			for x in range(min_x, max_x + 1)
+		])
+		points.append([points_map.get((x, y), 0) for x in range(min_x, max_x + 1)])
+	return occupancy, points
+
+
+def save_json(boards, path):
+	"""Write the placement lists of many boards to one JSON file."""
+	with open(path, "w") as f:
+		json.dump([solution_to_dict(board) for board in boards], f)
+
+
+def save_npz(boards, path):
+	"""
+	Write the occupancy and points arrays of many boards to one NumPy .npz file.
+
+	Boards are padded to the largest layout, so the file holds:
+		occupancy (n, rows, cols) int8, points (n, rows, cols) int32,
+		origins (n, 2) holding the (min_x, min_y) of each layout,
+		shapes (n, 2) holding the unpadded (rows, cols) of each layout.
+	"""
+	try:
+		import numpy as np
+	except ImportError as error:
+		raise ImportError("save_npz requires numpy, install it with 'pip install numpy'") from error
+
+	all_bounds = [board.layout_bounds() for board in boards]
+	shapes = [(max_y - min_y + 1, max_x - min_x + 1) for min_x, max_x, min_y, max_y in all_bounds]
+	rows = max((r for r, _ in shapes), default=0)
+	cols = max((c for _, c in shapes), default=0)
+
+	occupancy = np.zeros((len(boards), rows, cols), dtype=np.int8)
+	points = np.zeros((len(boards), rows, cols), dtype=np.int32)
+	for i, (board, bounds) in enumerate(zip(boards, all_bounds)):
+		board_occupancy, board_points = board_to_arrays(board, bounds)
+		r, c = shapes[i]
+		occupancy[i, :r, :c] = board_occupancy
+		points[i, :r, :c] = board_points
+
+	np.savez_compressed(
+		path,
+		occupancy=occupancy,
+		points=points,
+		origins=np.array([(min_x, min_y) for min_x, _, min_y, _ in all_bounds], dtype=np.int32).reshape(-1, 2),
+		shapes=np.array(shapes, dtype=np.int32).reshape(-1, 2),
+	)
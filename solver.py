@@ -2,24 +2,30 @@ from board import Board
 from test_cases import test_cases
 
 def solve_with_backtracking(grid_size, providers, receivers):
-	"""Solve the problem using backtracking."""
+	"""Solve the problem using the iterative backtracking search."""
 	board = Board(grid_size, providers, receivers)
-	if board.backtrack():
+	for obj in providers + receivers:
+		obj.board = board
+	if board.search():
 		return board.best_board
 	else:
 		return None
 
+def resolve_incremental(board, added=(), removed=(), radius=1):
+	"""Repair a solved board after adding or removing buildings, without a full re-solve."""
+	return board.repair_layout(added, removed, radius)
+
 def display_solution(board):
 	"""Display the solution in a grid format."""
 	board.print_grid()
-	# Print detailed placements
-	print("\nDetailed Placements:")
-	print("Providers placed at:")
+	# Print detailed placements in one write
+	lines = ["\nDetailed Placements:", "Providers placed at:"]
 	for provider, x, y, rotated in board.placed_providers:
-		print(f"  Provider '{provider.name}' at ({x}, {y}), rotated: {'Yes' if rotated else 'No'}")
-	print("Receivers placed at:")
+		lines.append(f"  Provider '{provider.name}' at ({x}, {y}), rotated: {'Yes' if rotated else 'No'}")
+	lines.append("Receivers placed at:")
 	for receiver, x, y, rotated in board.placed_receivers:
-		print(f"  Receiver '{receiver.name}' at ({x}, {y}), rotated: {'Yes' if rotated else 'No'}")
+		lines.append(f"  Receiver '{receiver.name}' at ({x}, {y}), rotated: {'Yes' if rotated else 'No'}")
+	print("\n".join(lines))
 
 def main(selected_case="case_1"):
 
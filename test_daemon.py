@@ -0,0 +1,125 @@
+import json
+import socket
+import threading
+import time
+from daemon import SolveDaemon, TCPServer, RequestHandler
+
+CASE = {
+	"grid_size": [6, 6],
+	"providers": [
+		{"name": "B", "width": 1, "height": 2, "points": 100, "effect_radius": 1},
+		{"name": "D", "width": 2, "height": 2, "points": 200, "effect_radius": 2},
+	],
+	"receivers": [{"name": "C", "width": 1, "height": 1, "required_points": 100}],
+}
+
+# Slow enough to still be searching when it is cancelled or out of time
+LARGE = {
+	"grid_size": [40, 40],
+	"providers": [{"name": "P", "width": 1, "height": 2, "points": 100, "effect_radius": 1}] * 2,
+	"receivers": [{"name": "R", "width": 1, "height": 1, "required_points": 200}] * 600,
+}
+
+
+class Replies:
+	def __init__(self):
+		self.messages = []
+		self.lock = threading.Lock()
+
+	def __call__(self, message):
+		with self.lock:
+			self.messages.append(message)
+
+
+def test_bad_payloads_are_answered_without_killing_workers():
+	daemon = SolveDaemon(workers=1)
+	replies = Replies()
+	for payload in ([1, 2], {"deadline": "x"}, {"id": [1]}, {"id": "bad"}):
+		daemon.submit(payload, replies)
+	daemon.jobs.join()
+	assert [m["status"] for m in replies.messages] == ["error", "error", "error", "queued", "error"]
+	assert daemon.cancel([1]) is False
+
+	def closed(message):
+		raise ValueError("I/O operation on closed file")
+
+	try:
+		daemon.submit(dict(CASE, id="closed"), closed)
+	except ValueError:
+		pass
+	daemon.jobs.join()
+	assert all(dispatcher.is_alive() for dispatcher in daemon.dispatchers)
+
+	job = daemon.submit(dict(CASE, id="after"), replies)
+	assert job.done.wait(10)
+	assert replies.messages[-1]["status"] == "solved"
+	daemon.close()
+
+
+def test_job_ids_are_unique():
+	daemon = SolveDaemon(workers=0)
+	replies = Replies()
+	first = daemon.submit(dict(CASE), replies)
+	second = daemon.submit(dict(CASE), replies)
+	assert first.job_id != second.job_id
+	assert daemon.submit(dict(CASE, id="same"), replies) is not None
+	assert daemon.submit(dict(CASE, id="same"), replies) is None
+	assert replies.messages[-1]["status"] == "error"
+	assert daemon.cancel(first.job_id) and first.cancelled.is_set() and not second.cancelled.is_set()
+
+
+def test_cancellation_is_scoped_to_the_owner():
+	daemon = SolveDaemon(workers=0)
+	replies = Replies()
+	mine = daemon.submit(dict(CASE, id="shared"), replies, owner="a")
+	theirs = daemon.submit(dict(CASE, id="shared"), replies, owner="b")
+	assert mine is not None and theirs is not None
+	assert daemon.cancel("shared", owner="c") is False
+	assert daemon.cancel("shared", owner="b")
+	assert theirs.cancelled.is_set() and not mine.cancelled.is_set()
+
+
+def test_running_search_is_cancelled_or_timed_out_in_its_process():
+	daemon = SolveDaemon(workers=2)
+	replies = Replies()
+	try:
+		job = daemon.submit(dict(LARGE, id="cancel"), replies)
+		late = daemon.submit(dict(LARGE, id="late", deadline=0.5), replies)
+		time.sleep(1)
+		assert daemon.cancel("cancel")
+		assert job.done.wait(20) and late.done.wait(20)
+		statuses = {m["id"]: m["status"] for m in replies.messages if m["status"] != "queued"}
+		assert statuses == {"cancel": "cancelled", "late": "timeout"}
+	finally:
+		daemon.close()
+
+
+def test_worker_process_cache_stays_warm():
+	daemon = SolveDaemon(workers=1)
+	replies = Replies()
+	try:
+		for job_id in ("first", "second"):
+			assert daemon.submit(dict(CASE, id=job_id), replies).done.wait(10)
+		first, second = [m for m in replies.messages if m["status"] == "solved"]
+		assert "cached" not in first and second["cached"]
+		assert first["placed_receivers"] == second["placed_receivers"]
+	finally:
+		daemon.close()
+
+
+def test_connection_survives_malformed_lines():
+	server = TCPServer(("127.0.0.1", 0), RequestHandler)
+	server.daemon = SolveDaemon(workers=1)
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	try:
+		with socket.create_connection(server.server_address, timeout=10) as client:
+			for line in ("not json", "[1, 2]", json.dumps({"deadline": "x"}), json.dumps(dict(CASE, id=7))):
+				client.sendall((line + "\n").encode())
+			client.shutdown(socket.SHUT_WR)
+			messages = [json.loads(line) for line in client.makefile()]
+	finally:
+		server.shutdown()
+		server.server_close()
+		server.daemon.close()
+	assert [m["status"] for m in messages] == ["error", "error", "error", "queued", "solved"]
+	assert messages[-1]["id"] == 7
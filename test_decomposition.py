@@ -0,0 +1,46 @@
+import random
+from decomposition import solve_with_decomposition
+from provider import ProviderObject
+from receiver import ReceiverObject
+from test_repair import check_consistent, check_receivers_served
+
+
+def random_instance(seed, receiver_count):
+	rng = random.Random(seed)
+	providers = [
+		ProviderObject(f"P{i}", rng.randint(1, 2), rng.randint(1, 2), 100, 1, None)
+		for i in range(receiver_count * 2)
+	]
+	receivers = [
+		ReceiverObject(f"R{i}", rng.randint(1, 2), rng.randint(1, 2), rng.choice([100, 200]), None)
+		for i in range(receiver_count)
+	]
+	return providers, receivers
+
+
+def check_inside_grid(board):
+	grid_width, grid_height = board.grid_size
+	for placement in board.placement_order:
+		min_x, max_x, min_y, max_y = board.placement_bounds(*placement)
+		assert 0 <= min_x and max_x < grid_width and 0 <= min_y and max_y < grid_height, placement[1:]
+
+
+def test_decomposition_layouts_are_valid():
+	for seed in range(25):
+		providers, receivers = random_instance(seed, 12)
+		board = solve_with_decomposition((8, 38), providers, receivers, band_count=6, workers=1)
+		assert board is not None, seed
+		check_consistent(board)
+		check_receivers_served(board)
+		check_inside_grid(board)
+		assert len(board.placed_receivers) == len(receivers)
+
+
+def test_decomposition_in_worker_processes():
+	providers, receivers = random_instance(19, 24)
+	board = solve_with_decomposition((20, 40), providers, receivers, workers=2)
+	assert board is not None
+	check_consistent(board)
+	check_receivers_served(board)
+	check_inside_grid(board)
+	assert len(board.placed_receivers) == len(receivers)
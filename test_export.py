@@ -0,0 +1,75 @@
+import json
+import pytest
+from board import Board
+from export import EMPTY, PROVIDER, RECEIVER, board_to_arrays, save_json, save_npz
+from provider import ProviderObject
+from receiver import ReceiverObject
+from test_repair import solve_case
+
+
+def check_codes(board, occupancy, origin):
+	"""Every cell of the occupancy rows holds the code of the object on it."""
+	min_x, min_y = origin
+	for row, y in zip(occupancy, range(min_y, min_y + len(occupancy))):
+		for code, x in zip(row, range(min_x, min_x + len(row))):
+			obj = board.grid.get((x, y))
+			expected = EMPTY if obj is None else PROVIDER if isinstance(obj, ProviderObject) else RECEIVER
+			assert code == expected, (x, y)
+
+
+def test_json_round_trip_matches_placements(tmp_path):
+	boards = [solve_case("case_1"), solve_case("case_2")]
+	path = tmp_path / "solutions.json"
+	save_json(boards, path)
+	with open(path) as f:
+		loaded = json.load(f)
+	assert len(loaded) == len(boards)
+	for board, data in zip(boards, loaded):
+		assert data["grid_size"] == list(board.grid_size)
+		assert data["bounds"] == list(board.layout_bounds())
+		for key in ("placed_providers", "placed_receivers"):
+			assert [(p["name"], p["x"], p["y"], p["rotated"]) for p in data[key]] == [
+				(obj.name, x, y, rotated) for obj, x, y, rotated in getattr(board, key)
+			]
+
+
+def test_arrays_follow_the_grid():
+	board = solve_case("case_1")
+	min_x, max_x, min_y, max_y = board.layout_bounds()
+	occupancy, points = board_to_arrays(board)
+	assert len(occupancy) == len(points) == max_y - min_y + 1
+	assert all(len(row) == max_x - min_x + 1 for row in occupancy + points)
+	check_codes(board, occupancy, (min_x, min_y))
+	assert points[0][0] == board.points_map.get((min_x, min_y), 0)
+	assert board.render_grid().count("\n") == max_y - min_y
+
+
+def test_layout_bounds_ignore_cells_back_to_zero():
+	provider = ProviderObject("P", 1, 1, 100, 2, None)
+	receiver = ReceiverObject("R", 1, 1, 100, None)
+	board = Board((10, 10), [provider], [receiver])
+	board.place_object(receiver, 5, 5, False)
+	board.place_object(provider, 2, 2, False)
+	assert board.layout_bounds() == (0, 5, 0, 5)
+	board.remove_object(provider, 2, 2, False)
+	assert (1, 1) in board.points_map
+	assert board.layout_bounds() == (5, 5, 5, 5)
+	assert board.render_points_map() == " .  "
+
+
+def test_npz_shapes_origins_and_codes(tmp_path):
+	np = pytest.importorskip("numpy")
+	boards = [solve_case("case_1"), solve_case("case_2")]
+	path = tmp_path / "solutions.npz"
+	save_npz(boards, path)
+	with np.load(path) as data:
+		occupancy, points, origins, shapes = data["occupancy"], data["points"], data["origins"], data["shapes"]
+	assert occupancy.shape == points.shape == (len(boards), shapes[:, 0].max(), shapes[:, 1].max())
+	for i, board in enumerate(boards):
+		min_x, max_x, min_y, max_y = board.layout_bounds()
+		assert tuple(origins[i]) == (min_x, min_y)
+		assert tuple(shapes[i]) == (max_y - min_y + 1, max_x - min_x + 1)
+		rows, cols = shapes[i]
+		check_codes(board, occupancy[i, :rows, :cols].tolist(), origins[i])
+		assert not occupancy[i, rows:].any() and not occupancy[i, :, cols:].any()
+		assert points[i, :rows, :cols].tolist() == board_to_arrays(board)[1]
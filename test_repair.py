@@ -0,0 +1,129 @@
+from board import Board
+from provider import ProviderObject
+from receiver import ReceiverObject
+from solver import solve_with_backtracking, resolve_incremental
+from test_cases import test_cases
+
+
+def solve_case(name):
+	case = test_cases[name]
+	return solve_with_backtracking(case["grid_size"], list(case["providers"]), list(case["receivers"]))
+
+
+def replayed_points_map(board):
+	"""points_map of a fresh board replaying the same placements in order."""
+	fresh = Board(board.grid_size, [], [])
+	for placement in board.placement_order:
+		fresh.place_object(*placement)
+	return {pos: points for pos, points in fresh.points_map.items() if points}
+
+
+def check_consistent(board):
+	assert min(board.points_map.values(), default=0) >= 0
+	assert {pos: points for pos, points in board.points_map.items() if points} == replayed_points_map(board)
+	for obj, x, y, rotated in board.placement_order:
+		min_x, max_x, min_y, max_y = board.placement_bounds(obj, x, y, rotated)
+		assert all(board.grid[(px, py)] is obj for px in range(min_x, max_x + 1) for py in range(min_y, max_y + 1))
+
+
+def check_receivers_served(board):
+	"""Every receiver is followed in placement_order by providers covering its required points."""
+	served = None
+	for obj, _, _, _ in board.placement_order + [(None, 0, 0, False)]:
+		if isinstance(obj, ProviderObject):
+			assert served is not None, "provider placed without a receiver"
+			served = (served[0], served[1] + obj.points)
+			continue
+		if served is not None:
+			receiver, points = served
+			assert points >= receiver.required_points, f"{receiver.name} got {points}"
+		served = (obj, 0) if obj is not None else None
+
+
+def test_unfix_everything_clears_points_map():
+	board = solve_case("case_1")
+	board.unfix_regions([(-100, 100, -100, 100)], 0)
+	assert not board.grid
+	assert not any(board.points_map.values())
+
+
+def test_partial_unfix_keeps_points_map_consistent():
+	for name in test_cases:
+		board = solve_case(name)
+		obj, x, y, rotated = board.placed_receivers[0]
+		board.unfix_regions([board.placement_bounds(obj, x, y, rotated)], 0)
+		check_consistent(board)
+		check_receivers_served(board)
+
+
+def test_repair_after_remove_and_add():
+	for name in test_cases:
+		board = solve_case(name)
+		receiver = board.placed_receivers[-1][0]
+		board = resolve_incremental(board, removed=[receiver])
+		assert board is not None
+		assert all(r is not receiver for r, _, _, _ in board.placed_receivers)
+		check_consistent(board)
+		check_receivers_served(board)
+
+		board = resolve_incremental(board, added=[ReceiverObject("N", 1, 1, 100, None)])
+		assert board is not None
+		assert "N" in [r.name for r, _, _, _ in board.placed_receivers]
+		check_consistent(board)
+		check_receivers_served(board)
+
+
+def test_removing_a_provider_requeues_its_receivers():
+	board = solve_case("case_1")
+	provider = board.placed_providers[0][0]
+	lifted = board.discard_object(provider)
+	assert lifted
+	assert all(p is not provider for p in board.providers)
+	assert all(p is not provider for p, _, _, _ in board.placement_order)
+	assert board.receivers
+	check_consistent(board)
+	check_receivers_served(board)
+
+
+def test_repair_rejects_objects_from_another_board():
+	board = solve_case("case_1")
+	try:
+		resolve_incremental(board, removed=[test_cases["case_1"]["receivers"][1]])
+	except ValueError:
+		pass
+	else:
+		assert False, "removing an object that is not on the board should raise"
+
+
+def test_failed_repair_leaves_the_board_unchanged():
+	board = solve_case("case_1")
+	before = list(board.placement_order)
+	points = {pos: value for pos, value in board.points_map.items() if value}
+	receivers = list(board.receivers)
+	assert resolve_incremental(board, added=[ReceiverObject("Z", 1, 1, 10 ** 9, None)]) is None
+	assert board.placement_order == before
+	assert {pos: value for pos, value in board.points_map.items() if value} == points
+	assert board.receivers == receivers
+	check_consistent(board)
+
+
+def test_receiver_that_cannot_fit_fails_and_leaves_the_board_unchanged():
+	board = solve_case("case_1")
+	before = list(board.placement_order)
+	assert board.repair_layout(added=[ReceiverObject("Z", 7, 7, 100, None)]) is None
+	assert board.placement_order == before
+	check_consistent(board)
+
+
+def test_invalid_removal_changes_nothing():
+	board = solve_case("case_1")
+	before = list(board.placement_order)
+	valid = board.placed_receivers[0][0]
+	try:
+		board.repair_layout(removed=[valid, test_cases["case_1"]["receivers"][1]])
+	except ValueError:
+		pass
+	else:
+		assert False, "removing an object that is not on the board should raise"
+	assert board.placement_order == before
+	assert any(r is valid for r, _, _, _ in board.placed_receivers)
@@ -0,0 +1,67 @@
+import contextlib
+import copy
+import io
+import sys
+from board import Board
+from provider import ProviderObject
+from receiver import ReceiverObject
+from test_cases import test_cases
+
+
+def case_board(case):
+	case = copy.deepcopy(case)
+	board = Board(case["grid_size"], case["providers"], case["receivers"])
+	for obj in case["providers"] + case["receivers"]:
+		obj.board = board
+	return board
+
+
+def chain_board(receiver_count):
+	providers = [ProviderObject("P", 1, 1, 100, 1, None) for _ in range(2)]
+	receivers = [ReceiverObject("R", 1, 1, 200, None) for _ in range(receiver_count)]
+	board = Board((400, 400), providers, receivers)
+	for obj in providers + receivers:
+		obj.board = board
+	return board
+
+
+def describe(placement_order):
+	return [(type(obj).__name__, obj.name, x, y, rotated) for obj, x, y, rotated in placement_order]
+
+
+def test_search_matches_backtrack():
+	for case in test_cases.values():
+		reference = case_board(case)
+		with contextlib.redirect_stdout(io.StringIO()):
+			assert reference.backtrack()
+		board = case_board(case)
+		assert board.search()
+		assert describe(board.placement_order) == describe(reference.placement_order)
+		assert describe(board.best_board.placement_order) == describe(reference.best_board.placement_order)
+
+
+def test_search_goes_deeper_than_the_recursion_limit():
+	limit = sys.getrecursionlimit()
+	depth = 0
+	frame = sys._getframe()
+	while frame is not None:
+		depth += 1
+		frame = frame.f_back
+	# Keep the instance small: lower the limit instead of raising the receiver count
+	sys.setrecursionlimit(depth + 50)
+	try:
+		receiver_count = sys.getrecursionlimit() + 10
+		board = chain_board(receiver_count)
+		assert board.search()
+		assert len(board.placed_receivers) == receiver_count
+
+		reference = chain_board(receiver_count)
+		try:
+			with contextlib.redirect_stdout(io.StringIO()):
+				reference.backtrack()
+		except RecursionError:
+			pass
+		else:
+			assert False, "backtrack should hit the recursion limit"
+	finally:
+		sys.setrecursionlimit(limit)